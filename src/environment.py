@@ -1,10 +1,33 @@
-from typing import Tuple, Set, Dict, List, Optional
-from utils.types_utils import Coord
+from typing import Tuple, Set, FrozenSet, Dict, List, Optional
+from utils.types_utils import Coord, PacmanPercept, MOVES
 import random
 import time
 
+# Ghost state is stored in per-field lists indexed by these positions
+GHOST_IDS: Tuple[str, ...] = ('A', 'B', 'C')
+GHOST_IDX: Dict[str, int] = {ghost_id: i for i, ghost_id in enumerate(GHOST_IDS)}
+
+# All orderings of the 3 respawn corners, indexed by one random draw
+_PERM3: Tuple[Tuple[int, int, int], ...] = ((0, 1, 2), (0, 2, 1), (1, 0, 2), (1, 2, 0), (2, 0, 1), (2, 1, 0))
+
+# Line-of-sight scan order for ghost percepts: UP, DOWN, LEFT, RIGHT
+PERCEPT_DIRECTIONS: Tuple[Coord, ...] = ((0, -1), (0, 1), (-1, 0), (1, 0))
+
+# One line-of-sight ray: the open cells it crosses as (pos, grid index or -1
+# when out of bounds), and the wall that stops it, if any
+Ray = Tuple[Tuple[Tuple[Coord, int], ...], Optional[Coord]]
+
 class Environment:
     """Grid representing the game environment."""
+
+    # Fixed attribute layout: faster attribute access than a per-instance dict
+    __slots__ = (
+        'w', 'h', 'walls', 'pellets', 'pellets_left', 'pacman_pos',
+        '_wall_grid', '_pellet_grid', '_render_rows', '_rays',
+        'ghost_pos', 'ghost_spawns', 'ghost_start_pos', '_respawn_corners',
+        'iterations', 'victory', 'game_over', 'score', 'lives'
+    )
+
     def __init__(
         self,
         w: int,
@@ -20,11 +43,38 @@ class Environment:
         self.w, self.h = w, h
         self.walls: Set[Coord] = set(walls or set())
         self.pellets: Set[Coord] = set(pellets or set())
+        self.pellets_left: int = len(self.pellets)
         self.pacman_pos: Coord = pacman_start
 
-        self.ghostA_pos: Coord = ghostA_start
-        self.ghostB_pos: Coord = ghostB_start
-        self.ghostC_pos: Coord = ghostC_start
+        # Flat wall/pellet grids (index y*w + x) for branch-free cell checks.
+        # The pellet grid mirrors self.pellets and is kept in sync in step()
+        self._wall_grid = bytearray(w * h)
+        for x, y in self.walls:
+            if 0 <= x < w and 0 <= y < h:
+                self._wall_grid[y * w + x] = 1
+        self._pellet_grid = bytearray(w * h)
+        for x, y in self.pellets:
+            if 0 <= x < w and 0 <= y < h:
+                self._pellet_grid[y * w + x] = 1
+
+        # Render template of walls and remaining pellets. Walls never change
+        # and step() blanks eaten pellets here, so render() only has to
+        # overlay the agents on a copy of these rows
+        self._render_rows: List[bytearray] = [
+            bytearray(ord('#') if self._wall_grid[y * w + x]
+                      else ord('.') if self._pellet_grid[y * w + x]
+                      else ord(' ') for x in range(w))
+            for y in range(h)
+        ]
+
+        # Percept ray templates: walls never change, so the cells each ray
+        # can see from a given tile are fixed and computed once per tile
+        self._rays: Dict[Coord, Tuple[Ray, ...]] = {
+            (x, y): self._build_rays((x, y))
+            for y in range(h) for x in range(w) if not self._wall_grid[y * w + x]
+        }
+
+        self.ghost_pos: List[Coord] = [ghostA_start, ghostB_start, ghostC_start]
         self.ghost_spawns: Set[Coord] = {ghostA_start, ghostB_start, ghostC_start}
 
         self.iterations: int = 0
@@ -33,10 +83,22 @@ class Environment:
         self.score: int = 0
         self.lives: int = 2
 
-        # Storing start positions for respawn
-        self.ghostA_start_pos = ghostA_start
-        self.ghostB_start_pos = ghostB_start
-        self.ghostC_start_pos = ghostC_start
+        # Storing start positions for respawn, and the respawn corners
+        self._respawn_corners: Tuple[Coord, ...] = ((1, 1), (w - 2, 1), (1, h - 2), (w - 2, h - 2))
+        self.ghost_start_pos: List[Coord] = [ghostA_start, ghostB_start, ghostC_start]
+
+    # Per-ghost accessors kept for callers that address ghosts by name
+    @property
+    def ghostA_pos(self) -> Coord:
+        return self.ghost_pos[0]
+
+    @property
+    def ghostB_pos(self) -> Coord:
+        return self.ghost_pos[1]
+
+    @property
+    def ghostC_pos(self) -> Coord:
+        return self.ghost_pos[2]
 
     def in_bounds(self, c: Coord) -> bool:
         """Return True if coordinate c is within grid bounds."""
@@ -48,21 +110,36 @@ class Environment:
         Return True if coordinate c is blocked for Pac-Man.
         Pac-Man is blocked by walls, bounds, OR the ghost spawn.
         """
-        return (
-            (not self.in_bounds(c)) or
-            (c in self.walls)
-        )
+        x, y = c
+        return not (0 <= x < self.w and 0 <= y < self.h) or self._wall_grid[y * self.w + x] == 1
 
     def ghost_blocked(self, c: Coord) -> bool:
         """
         Return True if coordinate c is blocked for a Ghost.
         Ghosts are blocked by walls and bounds, but NOT spawns.
         """
-        return (
-            (not self.in_bounds(c)) or
-            (c in self.walls)
-        )
+        x, y = c
+        return not (0 <= x < self.w and 0 <= y < self.h) or self._wall_grid[y * self.w + x] == 1
     
+    def _build_rays(self, origin: Coord) -> Tuple[Ray, ...]:
+        """Walk the 4 percept rays (up to 4 cells each) from origin, stopping at walls."""
+        w, h = self.w, self.h
+        rays = []
+        for dx, dy in PERCEPT_DIRECTIONS:
+            x, y = origin
+            cells = []
+            wall = None
+            for _ in range(4): # See up to 4 cells
+                x += dx
+                y += dy
+                idx = y * w + x if 0 <= x < w and 0 <= y < h else -1
+                if idx >= 0 and self._wall_grid[idx]:
+                    wall = (x, y)
+                    break
+                cells.append(((x, y), idx))
+            rays.append((tuple(cells), wall))
+        return tuple(rays)
+
     def get_ghost_percepts(
         self,
         ghost_id: str # 'A', 'B', or 'C'
@@ -81,42 +158,38 @@ class Environment:
         pacman_pos_seen: Optional[Coord] = None
         other_ghosts_seen: List[Tuple[str, Coord]] = []
         
-        ghost_pos = (0,0)
-        if ghost_id == 'A': ghost_pos = self.ghostA_pos
-        elif ghost_id == 'B': ghost_pos = self.ghostB_pos
-        elif ghost_id == 'C': ghost_pos = self.ghostC_pos
-        
-        # Define the 4 cardinal directions
-        directions = [(0, -1), (0, 1), (-1, 0), (1, 0)] # UP, DOWN, LEFT, RIGHT
+        self_idx = GHOST_IDX[ghost_id]
+        ghost_pos = self.ghost_pos[self_idx]
+        # Who stands where, resolved once instead of comparing every seen
+        # cell against each agent. Earlier entries win on shared tiles:
+        # Pac-Man first, then the other ghosts in A, B, C order
+        occupants: Dict[Coord, str] = {}
+        for j in (2, 1, 0):
+            if j != self_idx:
+                occupants[self.ghost_pos[j]] = GHOST_IDS[j]
+        occupants[self.pacman_pos] = "PACMAN"
+        pellet_grid = self._pellet_grid
+
+        rays = self._rays.get(ghost_pos)
+        if rays is None:
+            rays = self._build_rays(ghost_pos)
         
-        for dx, dy in directions:
-            for i in range(1, 5): # See up to 4 cells
-                x, y = ghost_pos[0] + dx * i, ghost_pos[1] + dy * i
-                pos = (x, y)
-                
-                # Check for walls first, as they block sight
-                if pos in self.walls:
-                    percept_map[pos] = "WALL"
-                    break # Stop seeing in this direction
-                
+        for cells, wall in rays:
+            for pos, idx in cells:
+                occupant = occupants.get(pos)
+
                 # Check for Pac-Man
-                if pos == self.pacman_pos:
+                if occupant == "PACMAN":
                     percept_map[pos] = "PACMAN"
                     pacman_pos_seen = pos
                 
                 # Check for other ghosts
-                elif pos == self.ghostA_pos and ghost_id != 'A':
-                    percept_map[pos] = "GHOST"
-                    other_ghosts_seen.append(("A", pos))
-                elif pos == self.ghostB_pos and ghost_id != 'B':
+                elif occupant is not None:
                     percept_map[pos] = "GHOST"
-                    other_ghosts_seen.append(("B", pos))
-                elif pos == self.ghostC_pos and ghost_id != 'C':
-                    percept_map[pos] = "GHOST"
-                    other_ghosts_seen.append(("C", pos))
+                    other_ghosts_seen.append((occupant, pos))
                 
                 # Check for pellets
-                elif pos in self.pellets:
+                elif idx >= 0 and pellet_grid[idx]:
                     percept_map[pos] = "PELLET"
                 
                 # If nothing else, it's an empty, traversable tile
@@ -124,11 +197,15 @@ class Environment:
                     # add empty tiles
                     percept_map[pos] = "EMPTY"
 
+            # Walls block sight, so the wall (if any) ends the ray
+            if wall is not None:
+                percept_map[wall] = "WALL"
+
         return pacman_pos_seen, other_ghosts_seen, percept_map
 
-    def sense(self) -> Dict:
-        """Return a percept dictionary describing the current state."""
-        return dict(
+    def sense(self) -> PacmanPercept:
+        """Return a percept tuple describing the current state."""
+        return PacmanPercept(
             pos=self.pacman_pos,
             pellet_here=(self.pacman_pos in self.pellets),
             iterations=self.iterations,
@@ -138,39 +215,26 @@ class Environment:
     def move_ghost(self, ghost_id: str, action: str) -> None:
         """Moves the specified ghost (A, B, or C) one step."""
 
-        current_pos = None
-        if ghost_id == 'A':
-            current_pos = self.ghostA_pos
-        elif ghost_id == 'B':
-            current_pos = self.ghostB_pos
-        elif ghost_id == 'C':
-            current_pos = self.ghostC_pos
-        else:
+        i = GHOST_IDX.get(ghost_id)
+        if i is None:
             return # Invalid ghost ID
+        current_pos = self.ghost_pos[i]
 
-        moves = {'RIGHT': (1, 0), 'LEFT': (-1, 0), 'DOWN': (0, 1), 'UP': (0, -1), 'WAIT': (0,0)}
-
-        if action in moves:
-            dx, dy = moves[action]
+        delta = MOVES.get(action)
+        if delta is not None:
+            dx, dy = delta
             nx, ny = current_pos[0] + dx, current_pos[1] + dy
 
-            # Ghosts use their own blocking logic
-            if not self.ghost_blocked((nx, ny)):
-                if ghost_id == 'A':
-                    self.ghostA_pos = (nx, ny)
-                elif ghost_id == 'B':
-                    self.ghostB_pos = (nx, ny)
-                elif ghost_id == 'C':
-                    self.ghostC_pos = (nx, ny)
+            # Ghosts use their own blocking logic (ghost_blocked, inlined)
+            w = self.w
+            if 0 <= nx < w and 0 <= ny < self.h and not self._wall_grid[ny * w + nx]:
+                self.ghost_pos[i] = (nx, ny)
 
         self.check_collision()
 
     def check_collision(self) -> bool:
         """Checks if Pac-Man and any Ghost are on the same tile."""
-        if self.pacman_pos == self.ghostA_pos or \
-            self.pacman_pos == self.ghostB_pos or \
-            self.pacman_pos == self.ghostC_pos:
-            
+        if self.pacman_pos in self.ghost_pos:
             self.lives -= 1
 
             if self.lives == -1:
@@ -180,22 +244,18 @@ class Environment:
     
     def respawn_ghosts(self) -> None:
         """Moves ghosts to the 3 corners farthest from Pac-Man."""
-        corners = [(1, 1), (self.w - 2, 1), (1, self.h - 2), (self.w - 2, self.h - 2)]
+        corners = self._respawn_corners
         px, py = self.pacman_pos
 
-        scored_corners = []
-        for cx, cy in corners:
-            # Manhathan distance
-            dist = abs(cx - px) + abs(cy - py)
-            scored_corners.append(((cx, cy), dist))
-        
-        scored_corners.sort(key=lambda x: x[1], reverse=True)
-        top_three_positions = [corner[0] for corner in scored_corners[:3]]
-        random.shuffle(top_three_positions)
-        
-        self.ghostA_pos = top_three_positions[0]
-        self.ghostB_pos = top_three_positions[1]
-        self.ghostC_pos = top_three_positions[2]
+        # Manhathan distance; the 3 farthest corners are all but the nearest
+        # one (the last nearest on ties). Their order is shuffled below
+        dists = [abs(cx - px) + abs(cy - py) for cx, cy in corners]
+        nearest = 3 - dists[::-1].index(min(dists))
+        top_three_positions = [corners[i] for i in range(4) if i != nearest]
+
+        # Uniform shuffle of the three slots: one draw picks a permutation
+        p = _PERM3[random.randrange(6)]
+        self.ghost_pos = [top_three_positions[p[0]], top_three_positions[p[1]], top_three_positions[p[2]]]
 
     def step(self, action: str) -> None:
         """Advance the environment one step given an action string.
@@ -206,23 +266,31 @@ class Environment:
         self.iterations += 1
 
         # Move Pac-Man according to the action
-        moves = {'RIGHT': (1, 0), 'LEFT': (-1, 0), 'DOWN': (0, 1), 'UP': (0, -1)}
-        if action in moves:
-            dx, dy = moves[action]
+        # 'WAIT' maps to (0, 0), which leaves Pac-Man in place
+        delta = MOVES.get(action)
+        if delta is not None:
+            dx, dy = delta
             nx, ny = self.pacman_pos[0] + dx, self.pacman_pos[1] + dy
-            if not self.pacman_blocked((nx, ny)):
+            # pacman_blocked, inlined
+            w = self.w
+            if 0 <= nx < w and 0 <= ny < self.h and not self._wall_grid[ny * w + nx]:
                 self.pacman_pos = (nx, ny)
 
         # Collect pellet if needed and add score
-        if self.pacman_pos in self.pellets:
+        px, py = self.pacman_pos
+        idx = py * self.w + px
+        if self._pellet_grid[idx]:
+            self._pellet_grid[idx] = 0
+            self._render_rows[py][px] = ord(' ')
             self.pellets.remove(self.pacman_pos)
+            self.pellets_left -= 1
             self.score +=10
 
         # Check Collision (Ghost kill Pac-Man)
         self.check_collision()
 
         # Check if no pellets are left or no lives left
-        if len(self.pellets) == 0:
+        if self.pellets_left == 0:
             self.victory = True
         
         if self.lives == -1:
@@ -241,29 +309,20 @@ class Environment:
             ' ' - Empty space
         """
         buf: List[str] = []
-        status_line = f"Iterations={self.iterations} | Pellets left={len(self.pellets)}\nLeft Lives={self.lives if self.lives > 0 else 0} | Score={self.score}\n"
+        status_line = f"Iterations={self.iterations} | Pellets left={self.pellets_left}\nLeft Lives={self.lives if self.lives > 0 else 0} | Score={self.score}\n"
         buf.append(status_line)
 
-        for y in range(self.h):
-            row = []
-            for x in range(self.w):
-                c = (x, y)
-                if c == self.ghostA_pos:
-                    ch = 'A'
-                elif c == self.ghostB_pos:
-                    ch = 'B'
-                elif c == self.ghostC_pos:
-                    ch = 'C'
-                elif c == self.pacman_pos:
-                    ch = 'P'
-                elif c in self.walls:
-                    ch = '#'
-                elif c in self.pellets:
-                    ch = '.'
-                else:
-                    ch = ' '
-                row.append(ch)
-            buf.append(''.join(row))
+        rows = [bytearray(row) for row in self._render_rows]
+
+        # Lowest priority first, so Ghost A ends up on top of everything
+        if self.pacman_pos is not None:
+            rows[self.pacman_pos[1]][self.pacman_pos[0]] = ord('P')
+        for i in (2, 1, 0):
+            pos = self.ghost_pos[i]
+            if pos is not None:
+                rows[pos[1]][pos[0]] = ord(GHOST_IDS[i])
+
+        buf.extend(row.decode() for row in rows)
 
         if self.victory:
             buf.append("VICTORY!")
@@ -273,35 +332,23 @@ class Environment:
 
         return '\n'.join(buf)
     
-def generate_maze(
-    w: int,
-    h: int,
-    pellet_density: float = 0.5
-) -> Tuple[Set[Coord], Set[Coord], Coord, Coord, Coord, Coord]:
-    """
-    Generate a fixed 25x10 maze and randomly place pellets in free spaces.
-
-    ASCII representation of the fixed maze:
-    '#' = Wall
-    ' ' = Empty space
-    """
-    # --- Define the Fixed Maze Layout ---
-
-    maze_ascii = [
-        "#########################", # y=0
-        "#           #           #", # y=1
-        "# #########   ######### #", # y=2
-        "# #       # # #       # #", # y=3
-        "# # #####   #   ##### # #", # y=4
-        "# #       #####       # #", # y=5
-        "#   ## ##       ## ##   #", # y=6
-        "#   #      ###      #   #", # y=7
-        "#     #############     #", # y=8
-        "#########################"  # y=9
-    ]
-
-    # --- Process the Maze ---
-
+# --- Define the Fixed Maze Layout ---
+
+MAZE_ASCII = (
+    "#########################", # y=0
+    "#           #           #", # y=1
+    "# #########   ######### #", # y=2
+    "# #       # # #       # #", # y=3
+    "# # #####   #   ##### # #", # y=4
+    "# #       #####       # #", # y=5
+    "#   ## ##       ## ##   #", # y=6
+    "#   #      ###      #   #", # y=7
+    "#     #############     #", # y=8
+    "#########################"  # y=9
+)
+
+def _parse_maze(maze_ascii: Tuple[str, ...]) -> Tuple[FrozenSet[Coord], Tuple[Coord, ...]]:
+    """Split an ASCII maze into its wall cells and its free cells (row-major order)."""
     walls: Set[Coord] = set()
     free_cells: List[Coord] = []
 
@@ -313,42 +360,46 @@ def generate_maze(
             else:
                 free_cells.append(c)
 
-    # --- Pac-Man and Ghosts positioning ---
+    return frozenset(walls), tuple(free_cells)
 
-    corners = [(1, 1), (w - 2, 1), (1, h - 2), (w - 2, h - 2)]
-    for c in corners:
-        walls.discard(c) # Remove wall if it exists
-        if c not in free_cells:
-            free_cells.append(c)
+# The layout never changes, so it is parsed only once, at import
+_MAZE_WALLS, _MAZE_FREE = _parse_maze(MAZE_ASCII)
+
+def generate_maze(
+    w: int,
+    h: int,
+    pellet_density: float = 0.5
+) -> Tuple[Set[Coord], Set[Coord], Coord, Coord, Coord, Coord]:
+    """
+    Generate a fixed 25x10 maze and randomly place pellets in free spaces.
+
+    The layout is the module-level MAZE_ASCII:
+    '#' = Wall
+    ' ' = Empty space
+    """
+    # --- Pac-Man and Ghosts positioning ---
 
     pacman_start = (1, 1)
     ghostA_start = (w - 2, 1)
     ghostB_start = (w - 2, h - 2)
     ghostC_start = (1, h - 2)
-    
-    # Ensure Pac-Man's or Ghost's start is not a wall (as a safety check)
-    if pacman_start in walls:
-        walls.discard(pacman_start)
+    reserved_spots = {pacman_start, ghostA_start, ghostB_start, ghostC_start}
 
-    if ghostA_start in walls:
-        walls.discard(ghostA_start)
+    # --- Use the pre-parsed Maze ---
 
-    if ghostB_start in walls:
-        walls.discard(ghostB_start)
+    walls: Set[Coord] = set(_MAZE_WALLS)
+    possible_pellet_cells = [c for c in _MAZE_FREE if c not in reserved_spots]
 
-    if ghostC_start in walls:
-        walls.discard(ghostC_start)
+    # Ensure Pac-Man's or Ghost's start is not a wall (as a safety check).
+    # The starts are the four corners, so this also clears the corners.
+    walls.difference_update(reserved_spots)
 
     # --- Generate Pellets ---
 
-    reserved_spots = {pacman_start, ghostA_start, ghostB_start, ghostC_start}
-    possible_pellet_cells = [c for c in free_cells if c not in reserved_spots]
-    
     # Place pellets randomly in the available free cells
     rng = random.Random()
     k_pellets = max(1, int(pellet_density * len(possible_pellet_cells)))
     
-    # Use possible_pellet_cells instead of free_cells
     pellets = set(rng.sample(possible_pellet_cells, k_pellets)) if k_pellets > 0 else set()
 
     return walls, pellets, pacman_start, ghostA_start, ghostB_start, ghostC_start
\ No newline at end of file
@@ -8,6 +8,9 @@ class KnowledgeBase(Protocol):
     these exact signatures will be considered a valid KB.
     """
 
+    # Lets implementations declare __slots__ without inheriting a __dict__
+    __slots__ = ()
+
     def tell(
         self,
         my_pos: Coord,
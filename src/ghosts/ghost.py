@@ -8,6 +8,7 @@ class Ghost:
     Its only job is to hold a Knowledge Base and pass messages to it.
     """
     
+    __slots__ = ('kb',)
     kb: KnowledgeBase
 
     def __init__(self, kb: KnowledgeBase):
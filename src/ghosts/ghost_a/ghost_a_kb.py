@@ -1,8 +1,40 @@
-from typing import Optional, Set, List, Tuple
-from utils.types_utils import Coord, Percept, MOVES
+from typing import Optional, Set, List, Tuple, Dict
+from utils.types_utils import Coord, Percept, MOVES, MOVE_NAMES, DX, DY, OPPOSITE
 from ghosts.KB import KnowledgeBase
 import random
 
+
+def _build_greedy_orders() -> Dict[Tuple[int, int, bool], Tuple[Tuple[str, int, int], ...]]:
+    """
+    Precomputes the move priority used by _smart_move for every
+    (sign(dx), sign(dy), |dx| >= |dy|) combination.
+    Each entry lists all 4 moves as (move, dx, dy), best first.
+    """
+    orders = {}
+    for sx in (-1, 0, 1):
+        for sy in (-1, 0, 1):
+            for x_major in (True, False):
+                horizontal = 'RIGHT' if sx > 0 else 'LEFT'
+                vertical = 'DOWN' if sy > 0 else 'UP'
+
+                # Prioritize axis with larger distance
+                if x_major:
+                    candidates = [horizontal]
+                    if sy != 0: candidates.append(vertical)
+                else:
+                    candidates = [vertical]
+                    if sx != 0: candidates.append(horizontal)
+
+                # Add remaining moves as fallback
+                for m in ['UP', 'DOWN', 'LEFT', 'RIGHT']:
+                    if m not in candidates: candidates.append(m)
+
+                orders[(sx, sy, x_major)] = tuple((m,) + MOVES[m] for m in candidates)
+    return orders
+
+_GREEDY_ORDERS = _build_greedy_orders()
+
+
 class KnowledgeBaseA(KnowledgeBase):
     """
     KB for Ghost A.
@@ -13,14 +45,19 @@ class KnowledgeBaseA(KnowledgeBase):
     - 'ask' queries these truth values to derive actions.
     """
 
+    __slots__ = (
+        'walls',
+        'state_patrolling', 'state_chasing', 'state_pursuing', 'state_investigating',
+        'last_known_pacman', 'last_move', 'investigation_target',
+        'my_pos', 'see_pacman', 'pacman_pos_percept'
+    )
+
     def __init__(self):
         # --- Internal State ---
         
         # Proposition: Wall_x_y is True if (x,y) is in self.walls
         self.walls: Set[Coord] = set()
-        
-        # Proposition: Safe_x_y is True if (x,y) is known safe
-        self.safe_tiles: Set[Coord] = set()
+        # (Safe_x_y is simply not Wall_x_y: no rule queries it, so it is not stored)
         
         # State Propositions (Only one is True at a time)
         # state_PA <=> not state_C and not state_PU and not state_I
@@ -58,10 +95,6 @@ class KnowledgeBaseA(KnowledgeBase):
         for pos, item in percepts.items():
             if item == "WALL":
                 self.walls.add(pos)
-                self.safe_tiles.discard(pos)
-            else:
-                # Proposition: not Wall_x_y => Safe_x_y
-                self.safe_tiles.add(pos)
 
         # Pacman Propositions
         # Proposition: SeePacman <=> (pacman_pos is not None)
@@ -79,14 +112,10 @@ class KnowledgeBaseA(KnowledgeBase):
         """
         action = 'WAIT'
 
-        # Query 1: Chasing Logic
+        # Query 1 & 2: Chasing and Pursuing Logic
         # Proposition: State_Chasing => MoveTowards(LastKnownPacman)
-        if self.state_chasing:
-            action = self._smart_move(self.last_known_pacman)
-
-        # Query 2: Pursuing Logic
         # Proposition: State_Pursuing => MoveTowards(LastKnownPacman)
-        elif self.state_pursuing:
+        if self.state_chasing or self.state_pursuing:
             action = self._smart_move(self.last_known_pacman)
 
         # Query 3: Investigating Logic
@@ -163,30 +192,21 @@ class KnowledgeBaseA(KnowledgeBase):
         Greedy movement towards target.
         Logic: Minimize Distance(MyPos, Target) s.t. not Wall(NextPos)
         """
-        if not target: return 'WAIT'
+        if target is None: return 'WAIT'
         
         # Determine desired axes
-        dx = target[0] - self.my_pos[0]
-        dy = target[1] - self.my_pos[1]
+        x, y = self.my_pos
+        dx = target[0] - x
+        dy = target[1] - y
         
-        candidates = []
-        # Prioritize axis with larger distance
-        if abs(dx) >= abs(dy):
-            candidates.append('RIGHT' if dx > 0 else 'LEFT')
-            if dy != 0: candidates.append('DOWN' if dy > 0 else 'UP')
-        else:
-            candidates.append('DOWN' if dy > 0 else 'UP')
-            if dx != 0: candidates.append('RIGHT' if dx > 0 else 'LEFT')
-            
-        # Add remaining moves as fallback
-        for m in ['UP', 'DOWN', 'LEFT', 'RIGHT']:
-            if m not in candidates: candidates.append(m)
+        # Candidate moves in priority order (see _build_greedy_orders).
+        # Bools are ints, so the signs need no branches, and comparing
+        # squares gives |dx| >= |dy| without two abs() calls
+        candidates = _GREEDY_ORDERS[((dx > 0) - (dx < 0), (dy > 0) - (dy < 0), dx * dx >= dy * dy)]
 
         # Check Safety (Proposition: not Wall_next)
-        for move in candidates:
-            mx, my = MOVES[move]
-            next_pos = (self.my_pos[0] + mx, self.my_pos[1] + my)
-            if next_pos not in self.walls:
+        for move, mx, my in candidates:
+            if (x + mx, y + my) not in self.walls:
                 return move
                 
         return 'WAIT'
@@ -197,13 +217,10 @@ class KnowledgeBaseA(KnowledgeBase):
         """
         # 1. Identify Valid Moves (Proposition: not Wall_next)
         valid_moves = []
-        reverse_move = self._get_reverse(self.last_move)
-
-        for move, (dx, dy) in MOVES.items():
-            if move == 'WAIT': continue
-            next_pos = (self.my_pos[0] + dx, self.my_pos[1] + dy)
-            if next_pos not in self.walls:
-                valid_moves.append(move)
+        x, y = self.my_pos
+        for d in range(4):
+            if (x + DX[d], y + DY[d]) not in self.walls:
+                valid_moves.append(MOVE_NAMES[d])
 
         if not valid_moves:
             return 'WAIT'
@@ -216,8 +233,8 @@ class KnowledgeBaseA(KnowledgeBase):
         # 3. Handle Junctions/Corners (Jitter Fix)
         # Logic: If stuck, choose Random from Valid \ {Reverse}
         # (Unless dead end, then Reverse is allowed)
+        reverse_move = self._get_reverse(self.last_move)
         non_reverse_moves = [m for m in valid_moves if m != reverse_move]
-        random.shuffle(non_reverse_moves)
         
         if non_reverse_moves:
             return random.choice(non_reverse_moves)
@@ -226,5 +243,4 @@ class KnowledgeBaseA(KnowledgeBase):
         return valid_moves[0]
 
     def _get_reverse(self, move: str) -> str:
-        opposites = {'UP': 'DOWN', 'DOWN': 'UP', 'LEFT': 'RIGHT', 'RIGHT': 'LEFT', 'WAIT': 'WAIT'}
-        return opposites.get(move, 'WAIT')
\ No newline at end of file
+        return OPPOSITE.get(move, 'WAIT')
\ No newline at end of file
@@ -1,16 +1,30 @@
 from typing import Set, List, Optional, Dict, Tuple, Deque
 from collections import deque
-from utils.types_utils import Coord, Percept, MOVES
-from utils.path_utils import bfs_pathfinder, get_move_from_path, get_neighbors, find_nearest_coord
+from utils.types_utils import Coord, Percept, MOVE_NAMES, DX, DY, DELTA_TO_MOVE
+from utils.path_utils import bfs_pathfinder, get_neighbors, find_nearest_coord
 from ghosts.KB import KnowledgeBase
 import random
 
+# Cardinal moves allowed by each 4-bit mask (bit d set <=> MOVE_NAMES[d] is open), in MOVE_NAMES order
+_MOVES_BY_MASK = tuple(tuple(MOVE_NAMES[d] for d in range(4) if mask >> d & 1) for mask in range(16))
+
 class KnowledgeBaseB(KnowledgeBase):
     """
     KB for Ghost B.
     Logic: Optimistic Model-Based Agent using PL to route through the fog of war.
     It also tracks the last n visited junctions to avoid repetitive patrolling.
     """
+
+    __slots__ = (
+        'walls', 'safe_tiles', 'unknown_tiles', 'junctions', 'believed_pellets',
+        '_planning_mesh',
+        'initialized',
+        'my_pos', 'pacman_visible', 'pacman_last_pos', 'percepts',
+        'clues', 'goal', 'current_path',
+        'visited_junctions',
+        'is_loitering', 'loiter_timer', 'loiter_anchor', 'MAX_LOITER_TIME'
+    )
+
     def __init__(self):
         # --- World Model ---
         self.walls: Set[Coord] = set()
@@ -18,6 +32,8 @@ class KnowledgeBaseB(KnowledgeBase):
         self.unknown_tiles: Set[Coord] = set()
         self.junctions: Set[Coord] = set()
         self.believed_pellets: Set[Coord] = set()
+        # safe_tiles | unknown_tiles, kept up to date as tiles are learned
+        self._planning_mesh: Set[Coord] = set()
 
         self.initialized = False
         
@@ -28,9 +44,10 @@ class KnowledgeBaseB(KnowledgeBase):
         self.percepts: Percept = {}
         
         # --- Memory & Plan ---
-        self.clues: List[Tuple[Coord, int]] = []
+        # Newest clue first; only the 2 most recent are kept
+        self.clues: Deque[Tuple[Coord, int]] = deque(maxlen=2)
         self.goal: Optional[Coord] = None
-        self.current_path: List[Coord] = []
+        self.current_path: Deque[Coord] = deque()
         
         # --- Junction Memory ---
         self.visited_junctions: Deque[Coord] = deque(maxlen=12)
@@ -50,6 +67,7 @@ class KnowledgeBaseB(KnowledgeBase):
             for n in get_neighbors(my_pos):  # Pre-seed unknown frontier
                 if n not in self.walls:
                     self.unknown_tiles.add(n)
+                    self._planning_mesh.add(n)
             self.initialized = True
         else:
             # Normal marking on subsequent turns
@@ -61,6 +79,7 @@ class KnowledgeBaseB(KnowledgeBase):
                 self.walls.add(pos)
                 self.safe_tiles.discard(pos)
                 self.unknown_tiles.discard(pos)
+                self._planning_mesh.discard(pos)
                 self.junctions.discard(pos)
             else:
                 self._mark_safe(pos) # Visible tiles are safe
@@ -77,27 +96,30 @@ class KnowledgeBaseB(KnowledgeBase):
             if c_pos == self.my_pos: continue
             if self.pacman_visible: continue
             if c_age < 25: alive_clues.append((c_pos, c_age + 1))
-        self.clues = alive_clues
+        self.clues = deque(alive_clues, maxlen=2)
 
         # 3. Update Pacman Interaction
         if pacman_pos:
             self.pacman_visible = True
             self.pacman_last_pos = pacman_pos
-            self.clues = []
+            self.clues.clear()
             self.is_loitering = False
-            self.goal = None # Reset goal to chase immediately
+            # Reset goal to chase immediately, unless Pac-Man is still where
+            # the current path leads: that path is still good, keep walking it
+            if pacman_pos != self.goal:
+                self.goal = None
         else:
             self.pacman_visible = False
             if new_clue_pos:
-                self.clues.insert(0, (new_clue_pos, 0))
-                if len(self.clues) > 2: self.clues.pop()
+                self.clues.appendleft((new_clue_pos, 0))
 
     def ask(self) -> str:
         if self.my_pos is None: return 'WAIT'
 
         # We treat "Unknown" as "Walkable until proven otherwise".
         # This allows BFS to find paths through the fog.
-        planning_mesh = self.safe_tiles.union(self.unknown_tiles)
+        # (Maintained incrementally by tell/_mark_safe rather than rebuilt here)
+        planning_mesh = self._planning_mesh
         # Ensure my current position is strictly in the mesh to avoid start-node errors
         planning_mesh.add(self.my_pos)
 
@@ -114,7 +136,7 @@ class KnowledgeBaseB(KnowledgeBase):
         if self.goal is not None and self.goal in self.walls:
             #print(f"[GHOST B] Dropping goal {self.goal} because it is now a known wall.")
             self.goal = None
-            self.current_path = []
+            self.current_path.clear()
 
         # 1. LOITERING
         if self.is_loitering:
@@ -122,7 +144,7 @@ class KnowledgeBaseB(KnowledgeBase):
             if self.loiter_timer <= 0 or self.pacman_visible:
                 self.is_loitering = False
                 self.goal = None
-                self.current_path = []
+                self.current_path.clear()
             else:
                 return self._execute_loiter_step(planning_mesh)
 
@@ -147,35 +169,36 @@ class KnowledgeBaseB(KnowledgeBase):
                 
                 # Clear goal/path BUT return WAIT to hold position
                 self.goal = None
-                self.current_path = []
+                self.current_path.clear()
                 return 'WAIT'
             else:
                 # Reached non-junction goal (e.g. clue) -> just clear and continue
                 self.goal = None
-                self.current_path = []
+                self.current_path.clear()
 
         # 3. GOAL SELECTION
         if self.goal is None:
             self.goal = self._select_new_goal(planning_mesh)
-            self.current_path = [] # New goal requires new path
+            self.current_path.clear() # New goal requires new path
 
         # 4. PATHFINDING
         if self.goal:
             # If we lack a path or have drifted off it
             needs_path = not self.current_path
             if self.current_path:
-                # Robustness: If next step isn't a neighbor, the path is broken
-                if self.current_path[0] not in get_neighbors(self.my_pos) and self.current_path[0] != self.my_pos:
+                # Robustness: If next step isn't a neighbor (or our own tile), the path is broken
+                nx, ny = self.current_path[0]
+                if abs(nx - self.my_pos[0]) + abs(ny - self.my_pos[1]) > 1:
                     needs_path = True
             
             if needs_path:
                 # Pass the OPTIMISTIC planning mesh to BFS
                 path = bfs_pathfinder(self.my_pos, self.goal, planning_mesh)
                 if path:
-                    self.current_path = path
+                    self.current_path = deque(path)
                     # BFS often returns [start, next, ..., goal]. Remove start if present.
                     if self.current_path and self.current_path[0] == self.my_pos:
-                        self.current_path.pop(0)
+                        self.current_path.popleft()
                 else:
                     self.goal = None # Goal unreachable even optimistically
 
@@ -185,18 +208,19 @@ class KnowledgeBaseB(KnowledgeBase):
             
             # Double check: Is the next step actually a wall we just discovered?
             if next_step in self.walls:
-                self.current_path = [] # Path blocked, replan next tick
+                self.current_path.clear() # Path blocked, replan next tick
                 return 'WAIT'
                 
             # Optimization: Pop the step so we don't loop
             if next_step == self.my_pos:
-                self.current_path.pop(0)
+                self.current_path.popleft()
                 if self.current_path:
                     next_step = self.current_path[0]
                 else:
                     return 'WAIT'
 
-            return get_move_from_path(self.my_pos, [self.my_pos, next_step])
+            # Next step is adjacent: its offset from us is the move
+            return DELTA_TO_MOVE.get((next_step[0] - self.my_pos[0], next_step[1] - self.my_pos[1]), 'WAIT')
 
         # 6. FALLBACK
         return self._get_random_optimistic_move()
@@ -206,13 +230,16 @@ class KnowledgeBaseB(KnowledgeBase):
 
 
     def _execute_loiter_step(self, mesh: Set[Coord]) -> str:
+        x, y = self.my_pos
         if self.my_pos == self.loiter_anchor:
             neighbors = [n for n in get_neighbors(self.loiter_anchor) if n in mesh]
             if neighbors:
-                step_out = random.choice(neighbors)
-                return get_move_from_path(self.my_pos, [self.my_pos, step_out])
+                sx, sy = random.choice(neighbors)
+                return DELTA_TO_MOVE[(sx - x, sy - y)]
             return 'WAIT'
-        return get_move_from_path(self.my_pos, [self.my_pos, self.loiter_anchor])
+        # Off the anchor we are one step away from it (or somewhere else after a respawn)
+        ax, ay = self.loiter_anchor
+        return DELTA_TO_MOVE.get((ax - x, ay - y), 'WAIT')
 
     def _select_new_goal(self, mesh: Set[Coord]) -> Optional[Coord]:
         """
@@ -232,42 +259,39 @@ class KnowledgeBaseB(KnowledgeBase):
         if self.clues:
             return self._select_best_clue()
 
-        # helper
-        def is_valid(c: Coord) -> bool:
-            return c not in self.walls and c in mesh and c != self.my_pos
-
-        # debug helper
-        def inspect(name, coords):
-            coords_list = list(coords)
-            #print(f"[GHOST B] Inspect {name}: total={len(coords_list)} sample={coords_list[:10]}")
+        # Candidates need no wall/mesh check: junctions are safe tiles and
+        # unknown tiles are never walls, and both are always in the mesh
 
-        inspect("unknown_tiles", self.unknown_tiles)
-        
         # Create exclusion set from visited queue
         excluded = {self.my_pos}
         excluded.update(self.visited_junctions)
 
         # 3. FAR JUNCTIONS
         # Filter out junctions that are in the 'excluded' (recently visited) set
-        far_juncs = [
+        mx, my = self.my_pos
+        far_juncs = {
             j for j in self.junctions
-            if j not in excluded and (abs(j[0]-self.my_pos[0]) + abs(j[1]-self.my_pos[1])) > 5 and is_valid(j)
-        ]
+            if j not in excluded and abs(j[0] - mx) + abs(j[1] - my) > 5
+        }
         if far_juncs:
-            #print("[GHOST B] Choosing far junctions:", far_juncs[:5])
-            return find_nearest_coord(self.my_pos, set(far_juncs), mesh)
+            #print("[GHOST B] Choosing far junctions:", list(far_juncs)[:5])
+            goal = find_nearest_coord(self.my_pos, far_juncs, mesh)
+            if goal is not None: return goal  # Otherwise none is reachable: try the next pass
 
         # 4. UNKNOWN FRONTIER
-        unknowns = [u for u in self.unknown_tiles if is_valid(u)]
+        # tell() always marks my_pos safe first, so it is never an unknown tile
+        # and the set can be searched as is, without a filtered copy
+        unknowns = self.unknown_tiles
         if unknowns:
-            #print("[GHOST B] Choosing unknown frontier sample:", unknowns[:5])
-            return find_nearest_coord(self.my_pos, set(unknowns), mesh)
+            #print("[GHOST B] Choosing unknown frontier sample:", list(unknowns)[:5])
+            goal = find_nearest_coord(self.my_pos, unknowns, mesh)
+            if goal is not None: return goal
 
         # 5. ANY JUNCTION (Fallback if we are stuck locally or have visited everywhere)
-        nearby_juncs = [j for j in self.junctions if j != self.my_pos and is_valid(j)]
+        nearby_juncs = self.junctions - {self.my_pos}
         if nearby_juncs:
-            #print("[GHOST B] Choosing nearby junctions (fallback):", nearby_juncs[:5])
-            return find_nearest_coord(self.my_pos, set(nearby_juncs), mesh)
+            #print("[GHOST B] Choosing nearby junctions (fallback):", list(nearby_juncs)[:5])
+            return find_nearest_coord(self.my_pos, nearby_juncs, mesh)
 
         return None
 
@@ -280,33 +304,37 @@ class KnowledgeBaseB(KnowledgeBase):
 
     def _mark_safe(self, pos: Coord):
         if pos in self.safe_tiles: return
-        self.safe_tiles.add(pos)
-        self.walls.discard(pos)
+        safe, walls = self.safe_tiles, self.walls
+        safe.add(pos)
+        walls.discard(pos)
         self.unknown_tiles.discard(pos)
+        self._planning_mesh.add(pos)
+
+        neighbors = get_neighbors(pos)
         
-        # Add neighbors to unknown if they are fresh
-        for n in get_neighbors(pos):
-            if n not in self.safe_tiles and n not in self.walls:
-                self.unknown_tiles.add(n)
-        
-        self._infer_junction(pos)
-        for n in get_neighbors(pos):
-            if n in self.safe_tiles: self._infer_junction(n)
+        # Add neighbors to unknown if they are fresh.
+        # Optimistic junction inference: any neighbor not known to be a wall counts
+        open_count = 0
+        for n in neighbors:
+            if n not in walls:
+                open_count += 1
+                if n not in safe:
+                    self.unknown_tiles.add(n)
+                    self._planning_mesh.add(n)
 
-    def _infer_junction(self, pos: Coord):
-        if pos in self.walls: return
-        count = 0
-        for n in get_neighbors(pos):
-            if n not in self.walls: count += 1 # Optimistic inference
-        if count >= 3: self.junctions.add(pos)
+        # Walls are only ever discovered, so a tile's open count can only drop
+        # after this point: it is a junction now or never becomes one
+        if open_count >= 3: self.junctions.add(pos)
 
     def _get_random_optimistic_move(self) -> str:
-        possible = []
-        for move, (dx, dy) in MOVES.items():
-            if move == 'WAIT': continue
-            nx, ny = self.my_pos[0]+dx, self.my_pos[1]+dy
-            # Move is valid if it is NOT a known wall
-            if (nx, ny) not in self.walls and (nx, ny) in self.safe_tiles.union(self.unknown_tiles):
-                possible.append(move)
-
-        return random.choice(possible) if possible else 'WAIT'
\ No newline at end of file
+        # Bit d of the mask is set when MOVE_NAMES[d] leads into the mesh.
+        # Known walls are never in the mesh, so this also rules them out
+        x, y = self.my_pos
+        mesh = self._planning_mesh
+        mask = 0
+        for d in range(4):
+            if (x + DX[d], y + DY[d]) in mesh:
+                mask |= 1 << d
+
+        possible = _MOVES_BY_MASK[mask]
+        return random.choice(possible) if possible else 'WAIT'
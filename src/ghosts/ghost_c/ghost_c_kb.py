@@ -1,11 +1,13 @@
-from typing import Tuple, List, Optional, Set, Dict
-from utils.types_utils import Coord, Percept, MOVES
-from utils.path_utils import get_neighbors, bfs_pathfinder, get_move_from_path, find_nearest_coord
-from utils.fol_components import Predicate, Constant, Variable, unify
+from typing import Tuple, List, Optional, Set, Dict, Type
+from collections import defaultdict
+from utils.types_utils import Coord, Percept, MOVES, MOVE_NAMES, DX, DY
+from utils.path_utils import get_neighbors, bfs_pathfinder, get_move_from_path, find_nearest_coord, bfs_nearest
+from utils.fol_components import Predicate, Constant, Variable, ground_values, unify_values, match_values, intern_constant
 from ghosts.KB import KnowledgeBase
 from .predicates import *
 import random
 
+
 class KnowledgeBaseC(KnowledgeBase):
     """
     KB for Ghost C.
@@ -21,8 +23,11 @@ class KnowledgeBaseC(KnowledgeBase):
     7. ETC
     """
     def __init__(self):
-        # FOL Knowledge Base: Set of ground predicates
-        self.facts: Set[Predicate] = set()
+        # FOL Knowledge Base: ground predicates indexed by predicate type,
+        # so a query only ever scans the facts of its own predicate.
+        # Facts are stored as their raw argument values, e.g. LearnedSafe(3, 4)
+        # is kept as (3, 4) in self.facts[LearnedSafe].
+        self.facts: Dict[Type[Predicate], Set[Tuple]] = defaultdict(set)
         
         # FOL Variables for queries
         self.X = Variable("X")
@@ -37,6 +42,9 @@ class KnowledgeBaseC(KnowledgeBase):
         self.my_pos: Coord = (24, 8)
         self.goal: Optional[Coord] = None
         self.current_path: List[Coord] = []
+        # Where my_pos is expected in current_path on the next ask(): BFS
+        # paths never repeat a tile, so it only needs checking, not searching for
+        self._path_idx: int = 0
         
         # Tracking for vector calculation
         self.last_pacman_pos: Optional[Coord] = None
@@ -66,9 +74,9 @@ class KnowledgeBaseC(KnowledgeBase):
         # 2. Assert current position in history
         # Assert: VisitedAtTime(my_pos.x, my_pos.y, current_time)
         self._assert_fact(VisitedAtTime(
-            Constant(my_pos[0]),
-            Constant(my_pos[1]),
-            Constant(self.current_time)
+            intern_constant(my_pos[0]),
+            intern_constant(my_pos[1]),
+            intern_constant(self.current_time)
         ))
 
         # Clean up old unreachable goals
@@ -76,9 +84,9 @@ class KnowledgeBaseC(KnowledgeBase):
         
         # FOL Rule 0: Store last position to prevent backtracking
         # Retract: ∀x,y: LastPos(C,x,y) → Retract
-        self._retract(LastPos(Constant('C'), self.X, self.Y))
+        self._retract(LastPos(intern_constant('C'), self.X, self.Y))
         # Assert: LastPos(C, my_pos.x, my_pos.y)
-        self._assert_fact(LastPos(Constant('C'), Constant(my_pos[0]), Constant(my_pos[1])))
+        self._assert_fact(LastPos(intern_constant('C'), intern_constant(my_pos[0]), intern_constant(my_pos[1])))
 
         # FOL Rule 1 & 2: Map Learning
         # ∀x,y: Percept(x,y)=WALL → LearnedWall(x,y)
@@ -90,19 +98,19 @@ class KnowledgeBaseC(KnowledgeBase):
 
         # FOL Rule 3: Assert current positions
         # Assert: GhostPos(C, my_pos.x, my_pos.y)
-        self._assert_fact(GhostPos(Constant('C'), Constant(my_pos[0]), Constant(my_pos[1])))
+        self._assert_fact(GhostPos(intern_constant('C'), intern_constant(my_pos[0]), intern_constant(my_pos[1])))
         
         # Assert: ∀g ∈ other_ghosts: GhostPos(g.id, g.x, g.y)
         for ghost_id, ghost_pos in other_ghost_pos:
             self._assert_fact(GhostPos(
-                Constant(ghost_id),
-                Constant(ghost_pos[0]),
-                Constant(ghost_pos[1])
+                intern_constant(ghost_id),
+                intern_constant(ghost_pos[0]),
+                intern_constant(ghost_pos[1])
             ))
         
         # FOL: Assert PacmanPos if visible
         if pacman_pos:
-            self._assert_fact(PacmanPos(Constant(pacman_pos[0]), Constant(pacman_pos[1])))
+            self._assert_fact(PacmanPos(intern_constant(pacman_pos[0]), intern_constant(pacman_pos[1])))
             
             # Compute PacmanVector
             if self.last_pacman_pos:
@@ -114,7 +122,7 @@ class KnowledgeBaseC(KnowledgeBase):
             self.last_pacman_pos = pacman_pos
             
             # Assert: PacmanVector(dx, dy)
-            self._assert_fact(PacmanVector(Constant(self.last_pacman_vector[0]), Constant(self.last_pacman_vector[1])))
+            self._assert_fact(PacmanVector(intern_constant(self.last_pacman_vector[0]), intern_constant(self.last_pacman_vector[1])))
 
     def ask(self) -> str:
         """
@@ -158,9 +166,9 @@ class KnowledgeBaseC(KnowledgeBase):
                 
                 # Assert the new state into KB
                 self._assert_fact(EscapeState(
-                    Constant(far_goal[0]),
-                    Constant(far_goal[1]),
-                    Constant(self.current_time)
+                    intern_constant(far_goal[0]),
+                    intern_constant(far_goal[1]),
+                    intern_constant(self.current_time)
                 ))
                 
                 new_goal = far_goal
@@ -246,7 +254,7 @@ class KnowledgeBaseC(KnowledgeBase):
             
             if need_replan:
                 self.goal = new_goal
-                safe_coords = self._query_all_safe_coords()
+                safe_coords = set(self._query_all_safe_coords())
                 
                 safe_coords.add(self.goal)
 
@@ -254,9 +262,9 @@ class KnowledgeBaseC(KnowledgeBase):
                 
                 if not new_path:
                     self._assert_fact(UnreachableGoal(
-                        Constant(self.goal[0]),
-                        Constant(self.goal[1]),
-                        Constant(self.current_time)
+                        intern_constant(self.goal[0]),
+                        intern_constant(self.goal[1]),
+                        intern_constant(self.current_time)
                     ))
                     
                     fallback = self._find_nearest_frontier_goal() or self._find_spread_goal()
@@ -268,23 +276,27 @@ class KnowledgeBaseC(KnowledgeBase):
                         
                 elif len(new_path) == 1 and new_path[0] != self.my_pos:
                     self._assert_fact(UnreachableGoal(
-                        Constant(self.goal[0]),
-                        Constant(self.goal[1]),
-                        Constant(self.current_time)
+                        intern_constant(self.goal[0]),
+                        intern_constant(self.goal[1]),
+                        intern_constant(self.current_time)
                     ))
                 
                 self.current_path = new_path
+                self._path_idx = 0
 
         # === EXECUTE NEXT MOVE ===
         if self.current_path:
-            # CRITICAL: Validate path includes current position
-            if self.my_pos not in self.current_path:
-                #print(f"[ERROR] Path invalid! my_pos={self.my_pos} not in path={self.current_path}")
-                self.current_path = []
-                self.goal = None
-                return self._get_safe_fallback_move()
-            
-            idx = self.current_path.index(self.my_pos)
+            # Expected case: a fresh path, or we made the last move along it
+            idx = self._path_idx
+            if idx >= len(self.current_path) or self.current_path[idx] != self.my_pos:
+                # CRITICAL: Validate path includes current position
+                if self.my_pos not in self.current_path:
+                    #print(f"[ERROR] Path invalid! my_pos={self.my_pos} not in path={self.current_path}")
+                    self.current_path = []
+                    self.goal = None
+                    return self._get_safe_fallback_move()
+                
+                idx = self.current_path.index(self.my_pos)
             
             if idx + 1 < len(self.current_path):
                 next_pos = self.current_path[idx + 1]
@@ -296,6 +308,7 @@ class KnowledgeBaseC(KnowledgeBase):
                 if is_safe or is_target_goal:
                     dist = abs(next_pos[0] - self.my_pos[0]) + abs(next_pos[1] - self.my_pos[1])
                     if dist == 1:
+                        self._path_idx = idx + 1
                         move = get_move_from_path(self.my_pos, [self.my_pos, next_pos])
                         return move
                     else:
@@ -328,25 +341,30 @@ class KnowledgeBaseC(KnowledgeBase):
         - ∀x,y: Percept(x,y)=WALL → LearnedWall(x,y)
         - ∀x,y: Percept(x,y)≠WALL → LearnedSafe(x,y)
         """
+        # Most percepts repeat what we already learned, so check the fact
+        # indices before building any predicate
+        safe_facts = self.facts[LearnedSafe]
+        wall_facts = self.facts[LearnedWall]
+
         # Rule: Current position is always safe
-        cx, cy = Constant(my_pos[0]), Constant(my_pos[1])
-        if not self._query_exists(LearnedSafe(cx, cy)):
-            self._assert_fact(LearnedSafe(cx, cy))
+        if my_pos not in safe_facts:
+            self._assert_fact(LearnedSafe(intern_constant(my_pos[0]), intern_constant(my_pos[1])))
         
         # Rule: Process all percepts
         for pos, item in percepts.items():
-            px, py = Constant(pos[0]), Constant(pos[1])
-            
             if item == "WALL":
+                if pos in wall_facts:
+                    continue
+                px, py = intern_constant(pos[0]), intern_constant(pos[1])
                 # Assert: LearnedWall(px, py)
-                if not self._query_exists(LearnedWall(px, py)):
-                    self._assert_fact(LearnedWall(px, py))
-                    # Retract conflicting safe assertion
-                    self._retract(LearnedSafe(px, py))
+                self._assert_fact(LearnedWall(px, py))
+                # Retract conflicting safe assertion
+                self._retract(LearnedSafe(px, py))
             else:
+                if pos in safe_facts:
+                    continue
                 # Assert: LearnedSafe(px, py)
-                if not self._query_exists(LearnedSafe(px, py)):
-                    self._assert_fact(LearnedSafe(px, py))
+                self._assert_fact(LearnedSafe(intern_constant(pos[0]), intern_constant(pos[1])))
 
 
     def _query_nearby_ghosts(self, repulsion_distance: int) -> List[Coord]:
@@ -408,29 +426,42 @@ class KnowledgeBaseC(KnowledgeBase):
         """
         FOL Query: {(x,y) | LearnedSafe(x,y)}
         Returns: Set of all safe coordinates
+
+        The LearnedSafe index already holds exactly these (x, y) tuples and is
+        kept up to date by every assert/retract, so it is returned as is
+        (a live view: callers must copy it before modifying it).
         """
-        results = self.get_unifications(LearnedSafe(self.X, self.Y))
-        return {(res[self.X].value, res[self.Y].value) for res in results}
+        return self.facts[LearnedSafe]
 
 
     def _is_unreachable_goal(self, goal: Coord) -> bool:
         """
         FOL Query: ∃t: UnreachableGoal(goal.x, goal.y, t)
         """
-        T = Variable("T")
         results = self.get_unifications(UnreachableGoal(
-            Constant(goal[0]),
-            Constant(goal[1]),
-            T
+            intern_constant(goal[0]),
+            intern_constant(goal[1]),
+            self.T
         ))
         return len(results) > 0
 
+    def _query_unreachable_coords(self) -> Set[Coord]:
+        """
+        FOL Query: {(x,y) | ∃t: UnreachableGoal(x,y,t)}
+        Indexes the UnreachableGoal facts by their ground (x, y) once, so
+        testing many candidates costs one scan instead of one per candidate.
+        """
+        results = self.get_unifications(UnreachableGoal(self.X, self.Y, self.T))
+        return {(res[self.X].value, res[self.Y].value) for res in results}
+
     def _is_position_safe(self, pos: Coord) -> bool:
         """
         FOL Query: LearnedSafe(pos.x, pos.y)
         Returns: True if position is safe
         """
-        return self._query_exists(LearnedSafe(Constant(pos[0]), Constant(pos[1])))
+        # LearnedSafe facts are stored as (x, y) tuples, so pos is probed as is
+        # (this runs for every tile of the current path, every tick)
+        return pos in self.facts[LearnedSafe]
 
     def _is_path_obstructed(self) -> bool:
         """
@@ -521,16 +552,17 @@ class KnowledgeBaseC(KnowledgeBase):
         Instead of returning the frontier tile itself (which is unknown),
         return the safe tile that's adjacent to it.
         """
-        frontier = self._compute_frontier()
-        frontier = {f for f in frontier if not self._is_unreachable_goal(f)}
-        
-        if not frontier:
-            return None
-        
         safe_coords = self._query_all_safe_coords()
-        
-        # Find the nearest frontier tile
-        nearest_frontier = find_nearest_coord(self.my_pos, frontier, safe_coords)
+        wall_coords = self.facts[LearnedWall]
+        unreachable = self._query_unreachable_coords()
+
+        # Find the nearest frontier tile in a single BFS over safe tiles.
+        # Every tile it tests neighbours a safe one, so Frontier(fx,fy) reduces to
+        # ¬LearnedSafe(fx,fy) ∧ ¬LearnedWall(fx,fy) (and the goal must not be unreachable)
+        nearest_frontier = bfs_nearest(
+            self.my_pos, safe_coords,
+            lambda c: c not in safe_coords and c not in wall_coords and c not in unreachable
+        )
         if not nearest_frontier:
             return None
         
@@ -612,16 +644,14 @@ class KnowledgeBaseC(KnowledgeBase):
             ∧ ¬LearnedSafe(fx,fy) ∧ ¬LearnedWall(fx,fy)
         """
         safe_tiles = self._query_all_safe_coords()
+        wall_tiles = self.facts[LearnedWall]
         frontier = set()
         
         for sx, sy in safe_tiles:
-            for neighbor in get_neighbors((sx, sy)):
-                nx, ny = neighbor
+            for neighbor in ((sx+1, sy), (sx-1, sy), (sx, sy+1), (sx, sy-1)):  # Same order as get_neighbors
                 # Check: ¬LearnedSafe(nx,ny) ∧ ¬LearnedWall(nx,ny)
-                is_safe = self._query_exists(LearnedSafe(Constant(nx), Constant(ny)))
-                is_wall = self._query_exists(LearnedWall(Constant(nx), Constant(ny)))
-                
-                if not is_safe and not is_wall:
+                # (probing the fact indices directly: this visits every safe tile's neighbours)
+                if neighbor not in safe_tiles and neighbor not in wall_tiles:
                     frontier.add(neighbor)
         
         return frontier
@@ -629,32 +659,26 @@ class KnowledgeBaseC(KnowledgeBase):
     def _assert_fact(self, fact: Predicate):
         """Assert a ground fact into the knowledge base."""
         if fact.is_ground():
-            self.facts.add(fact)
+            self.facts[type(fact)].add(ground_values(fact))
 
     def _retract_old_unreachable_goals(self, age_threshold: int):
         """
         FOL Rule: Clean up old unreachable goals
         ∀x,y,t: UnreachableGoal(x,y,t) ∧ (current_time - t > threshold) → Retract(UnreachableGoal(x,y,t))
         """
-        T = Variable("T")
-        unreachable_facts = self.get_unifications(UnreachableGoal(self.X, self.Y, T))
+        unreachable_facts = self.get_unifications(UnreachableGoal(self.X, self.Y, self.T))
         
         to_retract = []
         for result in unreachable_facts:
-            timestamp = result[T].value
+            timestamp = result[self.T].value
             age = self.current_time - timestamp
             
             if age > age_threshold:
                 x_val = result[self.X].value
                 y_val = result[self.Y].value
-                to_retract.append(UnreachableGoal(
-                    Constant(x_val),
-                    Constant(y_val),
-                    Constant(timestamp)
-                ))
+                to_retract.append((x_val, y_val, timestamp))
         
-        for fact in to_retract:
-            self.facts.discard(fact)
+        self.facts[UnreachableGoal].difference_update(to_retract)
 
     def _retract_dynamic_beliefs(self):
         """
@@ -669,11 +693,21 @@ class KnowledgeBaseC(KnowledgeBase):
 
     def _retract(self, query_template: Predicate):
         """Retract all facts matching the query template."""
-        to_remove = set()
-        for fact in self.facts:
-            if unify(query_template, fact) is not None:
-                to_remove.add(fact)
-        self.facts.difference_update(to_remove)
+        bucket = self.facts.get(type(query_template))
+        if not bucket:
+            return
+        # A ground template names a single stored tuple
+        if query_template.is_ground():
+            bucket.discard(ground_values(query_template))
+            return
+        # A template of distinct variables (e.g. PacmanPos(X, Y)) matches every
+        # fact of its predicate: drop the whole bucket without unifying each one
+        args = query_template.args
+        if all(isinstance(arg, Variable) for arg in args) and len(set(args)) == len(args):
+            bucket.clear()
+            return
+        to_remove = {values for values in bucket if unify_values(query_template, values) is not None}
+        bucket.difference_update(to_remove)
 
 
     def get_unifications(self, query: Predicate) -> List[Dict[Variable, Constant]]:
@@ -681,35 +715,35 @@ class KnowledgeBaseC(KnowledgeBase):
         Find all facts that unify with the query.
         Returns list of substitutions.
         """
-        results = []
-        for fact in self.facts:
-            if type(fact) == type(query):
-                substitution = unify(query, fact)
-                if substitution is not None:
-                    results.append(substitution)
-        return results
+        bucket = self.facts.get(type(query))
+        if not bucket:
+            return []
+
+        # Fully bound query: one hash probe instead of scanning the bucket
+        if query.is_ground():
+            return [{}] if ground_values(query) in bucket else []
+
+        return match_values(query, bucket)
 
     def _query_exists(self, query: Predicate) -> bool:
         """Check if query unifies with any fact in KB."""
         return len(self.get_unifications(query)) > 0
 
+    def _holds(self, fact: Predicate) -> bool:
+        """Check if a ground fact is in the KB (a single hash probe, no unification)."""
+        return ground_values(fact) in self.facts.get(type(fact), ())
+
     def _get_safe_fallback_move(self) -> str:
         """
         FOL Query: Find random safe move
         Query: ∃x,y: Neighbor(C,x,y) ∧ LearnedSafe(x,y)
         """
-        safe_moves = []
-        
-        for move_name, (dx, dy) in MOVES.items():
-            if move_name == 'WAIT':
-                continue
-            
-            nx = self.my_pos[0] + dx
-            ny = self.my_pos[1] + dy
-            
-            # FOL Check: LearnedSafe(nx, ny)
-            if self._is_position_safe((nx, ny)):
-                safe_moves.append(move_name)
+        # Read the LearnedSafe index directly: this runs on every fallback
+        safe_facts = self.facts.get(LearnedSafe, ())
+        x, y = self.my_pos
+
+        # FOL Check: LearnedSafe(x+dx, y+dy)
+        safe_moves = [MOVE_NAMES[d] for d in range(4) if (x + DX[d], y + DY[d]) in safe_facts]
         
         return random.choice(safe_moves) if safe_moves else 'WAIT'
     
@@ -720,18 +754,10 @@ class KnowledgeBaseC(KnowledgeBase):
         safe_tiles = self._query_all_safe_coords()
         if not safe_tiles:
             return None
-            
-        best_tile = None
-        max_dist = -1
-        
-        for tx, ty in safe_tiles:
-            dist = abs(tx - self.my_pos[0]) + abs(ty - self.my_pos[1])
-            # Ensure we don't pick a goal we are already at
-            if dist > max_dist:
-                max_dist = dist
-                best_tile = (tx, ty)
-                
-        return best_tile
+
+        # max() keeps the first tile with the largest distance, like a manual scan would
+        mx, my = self.my_pos
+        return max(safe_tiles, key=lambda t: abs(t[0] - mx) + abs(t[1] - my))
 
     def _query_active_escape(self, duration: int) -> Optional[Coord]:
         """
@@ -739,23 +765,19 @@ class KnowledgeBaseC(KnowledgeBase):
         Returns (X,Y) if state exists and is not expired.
         Retracts state if expired.
         """
-        T_var = Variable("T")
-        X_var = Variable("X")
-        Y_var = Variable("Y")
-        
-        results = self.get_unifications(EscapeState(X_var, Y_var, T_var))
+        results = self.get_unifications(EscapeState(self.X, self.Y, self.T))
         
         if results:
             # Get the most recent escape state
             res = results[0]
-            start_time = res[T_var].value
-            gx = res[X_var].value
-            gy = res[Y_var].value
+            start_time = res[self.T].value
+            gx = res[self.X].value
+            gy = res[self.Y].value
             
             # Check expiration
             if self.current_time - start_time > duration:
                 # Expired
-                self._retract(EscapeState(X_var, Y_var, T_var))
+                self._retract(EscapeState(self.X, self.Y, self.T))
                 return None
             
             return (gx, gy)
@@ -768,16 +790,14 @@ class KnowledgeBaseC(KnowledgeBase):
 
     def _retract_old_history(self, keep_last_n: int):
         """Retracts VisitedAtTime facts older than N steps."""
-        T = Variable("T")
-        history_facts = self.get_unifications(VisitedAtTime(self.X, self.Y, T))
+        history_facts = self.get_unifications(VisitedAtTime(self.X, self.Y, self.T))
         
         to_retract = []
         for result in history_facts:
-            if self.current_time - result[T].value > keep_last_n:
-                to_retract.append(VisitedAtTime(result[self.X], result[self.Y], result[T]))
+            if self.current_time - result[self.T].value > keep_last_n:
+                to_retract.append((result[self.X].value, result[self.Y].value, result[self.T].value))
         
-        for fact in to_retract:
-            self.facts.discard(fact)
+        self.facts[VisitedAtTime].difference_update(to_retract)
 
     def _infer_oscillation(self) -> bool:
         """
@@ -788,8 +808,8 @@ class KnowledgeBaseC(KnowledgeBase):
         t = self.current_time
         
         # We need to have visited THIS exact tile 2 and 4 ticks ago
-        was_here_t2 = self._query_exists(VisitedAtTime(Constant(x), Constant(y), Constant(t - 2)))
-        was_here_t4 = self._query_exists(VisitedAtTime(Constant(x), Constant(y), Constant(t - 4)))
+        was_here_t2 = self._holds(VisitedAtTime(intern_constant(x), intern_constant(y), intern_constant(t - 2)))
+        was_here_t4 = self._holds(VisitedAtTime(intern_constant(x), intern_constant(y), intern_constant(t - 4)))
         
         return was_here_t2 and was_here_t4
     
@@ -4,21 +4,23 @@ from utils.fol_components import Term, Predicate, Constant, LocationBasedPredica
 
 class LearnedWall(LocationBasedPredicate):
     """Fact: LearnedWall(x, y)"""
-    pass
+    __slots__ = ()
 
 class LearnedSafe(LocationBasedPredicate):
     """Fact: LearnedSafe(x, y)"""
-    pass
+    __slots__ = ()
 
 class PacmanPos(LocationBasedPredicate):
     """Belief: PacmanPos(x, y)"""
-    pass
+    __slots__ = ()
 
 
 # Dynamic Belief Predicates
 
 class VisitedAtTime(Predicate):
     """Fact: VisitedAtTime(x, y, t) - History tracking"""
+    __slots__ = ('x', 'y', 't')
+
     def __init__(self, x: Term, y: Term, t: Term):
         super().__init__(x, y, t)
         self.x = x
@@ -30,6 +32,8 @@ class EscapeState(Predicate):
     Fact: EscapeState(TargetX, TargetY, StartTime)
     Persists the commitment to run to a specific target to break a loop.
     """
+    __slots__ = ('tx', 'ty', 'start_time')
+
     def __init__(self, tx: Term, ty: Term, start_time: Term):
         super().__init__(tx, ty, start_time)
         self.tx = tx
@@ -39,6 +43,8 @@ class EscapeState(Predicate):
 
 class LastPos(Predicate):
     """Stores the last position of a ghost to avoid bouncing."""
+    __slots__ = ()
+
     def __init__(self, ghost_id: Constant, x: Constant, y: Constant):
         super().__init__("LastPos", ghost_id, x, y)
 
@@ -46,6 +52,8 @@ class LastPos(Predicate):
 class UnreachableGoal(Predicate):
     """Fact: UnreachableGoal(x,y,timestamp)
     Goals become reachable again after time passes."""
+    __slots__ = ('x', 'y', 'timestamp')
+
     def __init__(self, x: Term, y: Term, timestamp: Term):
         super().__init__(x, y, timestamp)
         self.x = x
@@ -55,6 +63,8 @@ class UnreachableGoal(Predicate):
 
 class PacmanVector(Predicate):
     """Belief: PacmanVector(dx, dy)"""
+    __slots__ = ('dx', 'dy')
+
     def __init__(self, dx: Term, dy: Term):
         super().__init__(dx, dy)
         self.dx = dx
@@ -62,6 +72,8 @@ class PacmanVector(Predicate):
 
 class GhostPos(Predicate):
     """Belief: GhostPos(AgentID, x, y)"""
+    __slots__ = ('agent_id', 'x', 'y')
+
     def __init__(self, agent_id: Term, x: Term, y: Term):
         super().__init__(agent_id, x, y)
         self.agent_id = agent_id
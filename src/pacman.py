@@ -39,36 +39,46 @@ def get_pressed_key() -> str:
         except ImportError:
             return None
 
-def handle_death_pause(env: Environment, sleep_s: float):
+def handle_death_pause(env: Environment, sleep_s: float, render: bool = True):
     """Handles the visual pause and respawn when Pac-Man dies."""
-    # Clear and Render (Show the collision)
-    if os.name == 'nt': os.system('cls')
-    print(env.render())
-    
-    # Print Message
-    print(f"\nPac-Man Became a Ghost Snack! 👻\nLives Left: {env.lives}")
-    print("Get Ready!\n")
-    time.sleep(sleep_s * 6)
+    if render:
+        # Clear and Render (Show the collision)
+        if os.name == 'nt': os.system('cls')
+        print(env.render())
+
+        # Print Message
+        print(f"\nPac-Man Became a Ghost Snack! 👻\nLives Left: {env.lives}")
+        print("Get Ready!\n")
+    if sleep_s > 0:
+        time.sleep(sleep_s * 6)
     
     # Respawn Ghosts
     if not env.game_over:
         env.respawn_ghosts()
 
+def draw_frame(env: Environment, sleep_s: float, render: bool = True):
+    """Print the current frame (if rendering) and wait sleep_s seconds (if positive)."""
+    if render:
+        if os.name == 'nt': os.system('cls')
+        print(env.render())
+        print()
+    if sleep_s > 0:
+        time.sleep(sleep_s)
+
 def run_game(
     env: Environment,
     ghost_a: Ghost,
     ghost_b: Ghost,
     ghost_c: Ghost,
-    sleep_s: float = 0.5
+    sleep_s: float = 0.5,
+    render: bool = True
 ):
-    """Run the Pac-Man game with keyboard controls."""
+    """Run the Pac-Man game with keyboard controls.
+        With render=False and sleep_s=0 the loop runs headless, e.g. for benchmarking."""
     pacman_action = "WAIT"
 
     # Initial Render
-    if os.name == 'nt': os.system('cls')
-    print(env.render())
-    print()
-    time.sleep(sleep_s)
+    draw_frame(env, sleep_s, render)
 
     while not env.victory and not env.game_over:
 
@@ -83,7 +93,7 @@ def run_game(
 
         if env.lives < current_lives:
             if env.game_over: break
-            handle_death_pause(env, sleep_s)
+            handle_death_pause(env, sleep_s, render)
             continue
 
         # Ghost's Step
@@ -95,7 +105,7 @@ def run_game(
             
             if env.lives < current_lives:
                 if env.game_over: break
-                handle_death_pause(env, sleep_s)
+                handle_death_pause(env, sleep_s, render)
                 continue
 
             # --- Ghost B ---
@@ -105,7 +115,7 @@ def run_game(
 
             if env.lives < current_lives:
                 if env.game_over: break
-                handle_death_pause(env, sleep_s)
+                handle_death_pause(env, sleep_s, render)
                 continue
 
             # --- Ghost C ---
@@ -115,19 +125,14 @@ def run_game(
 
             if env.lives < current_lives:
                 if env.game_over: break
-                handle_death_pause(env, sleep_s)
+                handle_death_pause(env, sleep_s, render)
                 continue
 
         # Normal Frame Render
-        if os.name == 'nt': os.system('cls')
-        print(env.render())
-        print()
-        time.sleep(sleep_s)
+        draw_frame(env, sleep_s, render)
 
     # Final Game Screen
-    if os.name == 'nt': os.system('cls')
-    print(env.render())
-    print()
+    draw_frame(env, 0, render)
 
 def run_pacman():
     """Game entry point: create a maze, instantiate the environment, run the game."""
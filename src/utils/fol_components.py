@@ -1,45 +1,87 @@
-from typing import Optional, Dict
+from typing import Optional, Dict, Tuple, List, Iterable
 
 class Term:
     """Base class for FOL terms (constants or variables)."""
-    pass
+    __slots__ = ()
 
 
 class Constant(Term):
     """A constant term in FOL (e.g., a specific coordinate value)."""
+    __slots__ = ('value', '_hash')
+
     def __init__(self, value):
         self.value = value
+        self._hash = hash(('Constant', value))
 
     def __eq__(self, other):
-        return isinstance(other, Constant) and self.value == other.value
+        if other.__class__ is not self.__class__:
+            return False
+        return self.value == other.value
 
     def __hash__(self):
-        return hash(('Constant', self.value))
+        return self._hash
+
+
+# Interned Constants, keyed by value (see intern_constant)
+_CONSTANTS: Dict[object, Constant] = {}
+# Past this many distinct values new ones are built but not cached,
+# so ever-growing values (e.g. timestamps) cannot grow the cache forever
+_MAX_INTERNED = 4096
+
+
+def intern_constant(value) -> Constant:
+    """Return the shared Constant for `value`, building it only the first time.
+
+    Constants are immutable and compare by value, so one instance per value
+    can be reused everywhere instead of allocating and hashing a new one.
+    """
+    const = _CONSTANTS.get(value)
+    if const is None:
+        const = Constant(value)
+        if len(_CONSTANTS) < _MAX_INTERNED:
+            _CONSTANTS[value] = const
+    return const
 
 
 class Variable(Term):
     """A variable term in FOL (e.g., X, Y)."""
+    __slots__ = ('name', '_hash')
+
     def __init__(self, name: str):
         self.name = name
+        self._hash = hash(('Variable', name))
 
     def __eq__(self, other):
-        return isinstance(other, Variable) and self.name == other.name
+        if other.__class__ is not self.__class__:
+            return False
+        return self.name == other.name
 
     def __hash__(self):
-        return hash(('Variable', self.name))
+        return self._hash
 
 
 class Predicate:
     """Base class for FOL predicates."""
+    __slots__ = ('args', '_hash')
+    _cls_name = 'Predicate'
+
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        # Bound once per predicate type instead of looked up on every hash
+        cls._cls_name = cls.__name__
+
     def __init__(self, *args: Term):
         self.args = args
+        # Predicates are immutable once built, so hash them only once
+        self._hash = hash((self._cls_name, args))
 
     def __eq__(self, other):
-        return (type(self) == type(other) and
-                self.args == other.args)
+        if other.__class__ is not self.__class__:
+            return False
+        return self.args == other.args
 
     def __hash__(self):
-        return hash((type(self).__name__, self.args))
+        return self._hash
 
     def is_ground(self) -> bool:
         """Check if the predicate contains only constants (no variables)."""
@@ -48,6 +90,8 @@ class Predicate:
 
 class LocationBasedPredicate(Predicate):
     """Base class for predicates that refer to a location (x, y)."""
+    __slots__ = ('x', 'y')
+
     def __init__(self, x: Term, y: Term):
         super().__init__(x, y)
         self.x = x
@@ -90,3 +134,154 @@ def unify(query: Predicate, fact: Predicate) -> Optional[Dict[Variable, Constant
                 substitution[q_arg] = f_arg
 
     return substitution
+
+
+def ground_values(fact: Predicate) -> Tuple:
+    """Return the raw argument values of a ground predicate."""
+    return tuple(arg.value for arg in fact.args)
+
+
+def _unify_values_2(query: Predicate, values: Tuple) -> Optional[Dict[Variable, Constant]]:
+    """Unrolled `unify_values` for 2-argument predicates (e.g. LearnedSafe(x, y))."""
+    q0, q1 = query.args
+    v0, v1 = values
+    substitution = {}
+
+    if isinstance(q0, Constant):
+        if q0.value != v0:
+            return None
+    elif isinstance(q0, Variable):
+        substitution[q0] = intern_constant(v0)
+
+    if isinstance(q1, Constant):
+        if q1.value != v1:
+            return None
+    elif isinstance(q1, Variable):
+        if q1 in substitution:
+            if substitution[q1].value != v1:
+                return None
+        else:
+            substitution[q1] = intern_constant(v1)
+
+    return substitution
+
+
+def _unify_values_3(query: Predicate, values: Tuple) -> Optional[Dict[Variable, Constant]]:
+    """Unrolled `unify_values` for 3-argument predicates (e.g. VisitedAtTime(x, y, t))."""
+    q0, q1, q2 = query.args
+    v0, v1, v2 = values
+    substitution = {}
+
+    if isinstance(q0, Constant):
+        if q0.value != v0:
+            return None
+    elif isinstance(q0, Variable):
+        substitution[q0] = intern_constant(v0)
+
+    if isinstance(q1, Constant):
+        if q1.value != v1:
+            return None
+    elif isinstance(q1, Variable):
+        if q1 in substitution:
+            if substitution[q1].value != v1:
+                return None
+        else:
+            substitution[q1] = intern_constant(v1)
+
+    if isinstance(q2, Constant):
+        if q2.value != v2:
+            return None
+    elif isinstance(q2, Variable):
+        if q2 in substitution:
+            if substitution[q2].value != v2:
+                return None
+        else:
+            substitution[q2] = intern_constant(v2)
+
+    return substitution
+
+
+def _unify_values_n(query: Predicate, values: Tuple) -> Optional[Dict[Variable, Constant]]:
+    """Generic `unify_values` for any arity."""
+    substitution = {}
+
+    for q_arg, value in zip(query.args, values):
+        if isinstance(q_arg, Constant):
+            if q_arg.value != value:
+                return None
+        elif isinstance(q_arg, Variable):
+            if q_arg in substitution:
+                if substitution[q_arg].value != value:
+                    return None
+            else:
+                substitution[q_arg] = intern_constant(value)
+
+    return substitution
+
+
+# Arity -> specialized unifier; other arities use the generic loop
+_VALUE_UNIFIERS = {
+    2: _unify_values_2,
+    3: _unify_values_3,
+}
+
+
+def unify_values(query: Predicate, values: Tuple) -> Optional[Dict[Variable, Constant]]:
+    """Unify a query predicate with a ground fact stored as raw argument values.
+
+    Same contract as `unify`, but the fact side is the plain tuple returned by
+    `ground_values`, so stored facts never need Constant wrappers.
+    Dispatches on arity to an unrolled implementation where one exists.
+
+    Args:
+        query: A predicate that may contain variables
+        values: The argument values of a ground fact of the same predicate type
+
+    Returns:
+        Substitution dict mapping variables to constants if unification succeeds,
+        None otherwise.
+    """
+    arity = len(values)
+    if len(query.args) != arity:
+        return None
+
+    return _VALUE_UNIFIERS.get(arity, _unify_values_n)(query, values)
+
+
+def match_values(query: Predicate, facts: Iterable[Tuple]) -> List[Dict[Variable, Constant]]:
+    """Unify a query predicate against many ground facts stored as value tuples.
+
+    Equivalent to calling `unify_values` on every fact, but the query is
+    analysed only once: the loop over facts just compares the bound
+    positions and then reads off the variable bindings.
+
+    Args:
+        query: A predicate that may contain variables
+        facts: Argument-value tuples of ground facts of the query's type
+
+    Returns:
+        One substitution dict per matching fact.
+    """
+    arity = len(query.args)
+    bound = [(i, arg.value) for i, arg in enumerate(query.args) if isinstance(arg, Constant)]
+    variables = [(i, arg) for i, arg in enumerate(query.args) if isinstance(arg, Variable)]
+
+    # A repeated variable needs a consistency check per fact: use the full unifier
+    if len({var for _, var in variables}) != len(variables):
+        results = []
+        for values in facts:
+            substitution = unify_values(query, values)
+            if substitution is not None:
+                results.append(substitution)
+        return results
+
+    results = []
+    for values in facts:
+        if len(values) != arity:
+            continue
+        for i, value in bound:
+            if values[i] != value:
+                break
+        else:
+            results.append({var: intern_constant(values[i]) for i, var in variables})
+    return results
@@ -1,6 +1,6 @@
-from typing import Set, List, Optional
+from typing import Set, List, Optional, Dict, Callable
 from collections import deque
-from .types_utils import Coord, MOVES
+from .types_utils import Coord, DELTA_TO_MOVE
 
 def get_neighbors(pos: Coord) -> List[Coord]:
     """Gets the 4 adjacent neighbors of a coordinate."""
@@ -25,19 +25,30 @@ def bfs_pathfinder(
     if start_pos not in safe_tiles:
         return None
 
-    queue = deque([(start_pos, [start_pos])])
-    visited = {start_pos}
+    # Each visited tile remembers the tile it was reached from, so the path
+    # is rebuilt once at the end instead of copied at every enqueue
+    parents: Dict[Coord, Optional[Coord]] = {start_pos: None}
+    queue = deque([start_pos])
 
     while queue:
-        current_pos, path = queue.popleft()
+        current_pos = queue.popleft()
+        x, y = current_pos
 
-        for neighbor in get_neighbors(current_pos):
+        # Same order as get_neighbors
+        for neighbor in ((x+1, y), (x-1, y), (x, y+1), (x, y-1)):
             if neighbor == goal_pos:
-                return path + [neighbor]  # Path found
+                # Path found: follow the parents back to the start
+                path = [neighbor]
+                node = current_pos
+                while node is not None:
+                    path.append(node)
+                    node = parents[node]
+                path.reverse()
+                return path
 
-            if neighbor in safe_tiles and neighbor not in visited:
-                visited.add(neighbor)
-                queue.append((neighbor, path + [neighbor]))
+            if neighbor in safe_tiles and neighbor not in parents:
+                parents[neighbor] = current_pos
+                queue.append(neighbor)
     
     return None  # No path foundd
 
@@ -55,13 +66,7 @@ def get_move_from_path(
     cx, cy = current_pos
     nx, ny = path[1]  # The next step
     
-    dx, dy = nx - cx, ny - cy
-
-    for move, (mdx, mdy) in MOVES.items():
-        if (dx, dy) == (mdx, mdy):
-            return move
-            
-    return 'WAIT'
+    return DELTA_TO_MOVE.get((nx - cx, ny - cy), 'WAIT')
 
 def find_nearest_coord(
     start_pos: Coord,
@@ -82,9 +87,10 @@ def find_nearest_coord(
     visited = {start_pos}
 
     while queue:
-        current_pos = queue.popleft()
+        x, y = queue.popleft()
         
-        for neighbor in get_neighbors(current_pos):
+        # Same order as get_neighbors
+        for neighbor in ((x+1, y), (x-1, y), (x, y+1), (x, y-1)):
             if neighbor in target_coords:
                 return neighbor  # Found the closest target
             
@@ -92,4 +98,37 @@ def find_nearest_coord(
                 visited.add(neighbor)
                 queue.append(neighbor)
 
-    return None # No reachable target
\ No newline at end of file
+    return None # No reachable target
+
+def bfs_nearest(
+    start_pos: Coord,
+    safe_tiles: Set[Coord],
+    is_target: Callable[[Coord], bool]
+) -> Optional[Coord]:
+    """
+    Like find_nearest_coord, but the targets are given as a test instead of
+    a set, so they never have to be collected up front: the search stops at
+    the first tile (closest by path distance) for which is_target is True.
+    Only 'safe_tiles' are expanded.
+    """
+    if is_target(start_pos):
+        return start_pos
+
+    queue = deque([start_pos])
+    visited = {start_pos}
+
+    while queue:
+        x, y = queue.popleft()
+
+        # Same order as get_neighbors
+        for neighbor in ((x+1, y), (x-1, y), (x, y+1), (x, y-1)):
+            if neighbor in visited:
+                continue
+            if is_target(neighbor):
+                return neighbor
+
+            if neighbor in safe_tiles:
+                visited.add(neighbor)
+                queue.append(neighbor)
+
+    return None # No reachable target
@@ -1,4 +1,4 @@
-from typing import Tuple, Dict, Set, List, Optional
+from typing import Tuple, Dict, Set, List, Optional, NamedTuple
 
 # Coordinate type for all grid positions
 Coord = Tuple[int, int]
@@ -7,6 +7,13 @@ Coord = Tuple[int, int]
 # A percept is a dictionary mapping a coordinate to what the ghost sees there.
 Percept = Dict[Coord, str]
 
+class PacmanPercept(NamedTuple):
+    """What Pac-Man senses each step (see Environment.sense)."""
+    pos: Coord
+    pellet_here: bool
+    iterations: int
+    victory: bool
+
 # Move/Direction Definitions
 MOVES = {
     'UP': (0, -1),
@@ -15,4 +22,18 @@ MOVES = {
     'RIGHT': (1, 0),
     'WAIT': (0, 0)
 }
-DIRECTIONS = list(MOVES.keys())
\ No newline at end of file
+DIRECTIONS = tuple(MOVES.keys())
+
+# Cardinal moves (no WAIT) as parallel fixed-order tuples, for index-based loops.
+# Opposite moves differ only in the lowest bit: MOVE_NAMES[d ^ 1] reverses d
+MOVE_NAMES = ('UP', 'DOWN', 'LEFT', 'RIGHT')
+DX = tuple(MOVES[m][0] for m in MOVE_NAMES)
+DY = tuple(MOVES[m][1] for m in MOVE_NAMES)
+NAME_TO_IDX = {m: d for d, m in enumerate(MOVE_NAMES)}
+
+# Opposite of every move ('WAIT' is its own opposite)
+OPPOSITE = {m: MOVE_NAMES[d ^ 1] for m, d in NAME_TO_IDX.items()}
+OPPOSITE['WAIT'] = 'WAIT'
+
+# Reverse lookup of MOVES: (dx, dy) -> move name
+DELTA_TO_MOVE = {delta: m for m, delta in MOVES.items()}